@@ -11,34 +11,147 @@ from sklearn.calibration import LabelEncoder
 from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 import streamlit as st
+from joblib import Parallel, delayed
 from xgboost import XGBClassifier
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional - the kernels below then run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# error_model='numpy' keeps pandas' inf/nan results on division by zero instead of raising
+@njit(cache=True, error_model='numpy')
+def _price_features(close):
+    """ma5, ma10, return_1d and return_5d of a close-price array in a single pass"""
+    n = close.shape[0]
+    out = np.full((n, 4), np.nan)
+    # Running sums skip NaN closes; a window is NaN only while it still holds one, like rolling().mean()
+    sum5 = 0.0
+    sum10 = 0.0
+    nan5 = 0
+    nan10 = 0
+    for i in range(n):
+        if np.isnan(close[i]):
+            nan5 += 1
+            nan10 += 1
+        else:
+            sum5 += close[i]
+            sum10 += close[i]
+        if i >= 5:
+            if np.isnan(close[i - 5]):
+                nan5 -= 1
+            else:
+                sum5 -= close[i - 5]
+        if i >= 10:
+            if np.isnan(close[i - 10]):
+                nan10 -= 1
+            else:
+                sum10 -= close[i - 10]
+        if i >= 4 and nan5 == 0:
+            out[i, 0] = sum5 / 5
+        if i >= 9 and nan10 == 0:
+            out[i, 1] = sum10 / 10
+        if i >= 1:
+            out[i, 2] = close[i] / close[i - 1] - 1
+        if i >= 5:
+            out[i, 3] = close[i] / close[i - 5] - 1
+    return out
+
+@njit(cache=True, error_model='numpy')
+def _rsi_wilder(close, n=14):
+    """RSI with Wilder smoothing, computed in one pass over the close prices"""
+    size = close.shape[0]
+    rsi = np.full(size, np.nan)
+    if size <= n:
+        return rsi
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, size):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i <= n:
+            # Seed with the simple average of the first window
+            avg_gain += gain / n
+            avg_loss += loss / n
+            if i < n:
+                continue
+        else:
+            avg_gain = (avg_gain * (n - 1) + gain) / n
+            avg_loss = (avg_loss * (n - 1) + loss) / n
+        rsi[i] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi
+
+@njit(cache=True)
+def _backtest(actions, close):
+    """Portfolio value per row when buying on 1 and selling on 2, starting from capital 1.0"""
+    capital = 1.0
+    position = 0.0
+    values = np.empty(close.shape[0])
+    for i in range(close.shape[0]):
+        price = close[i]
+        if actions[i] == 1 and position == 0:
+            position = capital / price
+            capital = 0.0
+        elif actions[i] == 2 and position > 0:
+            capital = position * price
+            position = 0.0
+        values[i] = capital if position == 0 else position * price
+    return values
+
+_ACTION_CODES = {'Hold': 0, 'Buy': 1, 'Sell': 2}
+
+FEATURE_COLS = ('ma5', 'ma10', 'return_1d', 'return_5d', 'rsi', 'eps', 'roe')
+
 class ChatGPT_def:
 
+    @staticmethod
+    def train_one(ticker, df):
+        """Train the model for one ticker. Runs in a worker process, so warnings are returned instead of shown."""
+        messages = []
+        data = ChatGPT_def.create_features(df, ticker)
+        if data['action'].nunique() < 2:
+            return ticker, None, messages
+        try:
+            model, report, le = ChatGPT_def.train_model(data, on_warning=messages.append)
+        except Exception as e:
+            messages.append(f"Lỗi khi huấn luyện mô hình cho {ticker}: {e}")
+            return ticker, None, messages
+        X_all = data[list(FEATURE_COLS)].to_numpy(np.float32)
+        return ticker, (model, data, report, le, X_all), messages
+
+    @staticmethod
+    @st.cache_resource(show_spinner=False)
+    def train_models(df):
+        """Train one model per ticker in parallel; cached so reruns reuse the trained models"""
+        tickers = [col for col in df.columns if col not in ['time', 'VNINDEX']]
+        return Parallel(n_jobs=-1, prefer='processes')(
+            delayed(ChatGPT_def.train_one)(ticker, df) for ticker in tickers
+        )
+
     @staticmethod
     def models_prediction(df):
         if df.empty:
             st.warning("Chưa có dữ liệu để hiển thị.")
             st.stop()
 
-        tickers = [col for col in df.columns if col not in ['time', 'VNINDEX']]
         models = {}
         latest_predictions = []
 
-        for ticker in tickers:
-            data = ChatGPT_def.create_features(df, ticker)
-            if data['action'].nunique() < 2:
-                continue
-            try:
-                model, report, le = ChatGPT_def.train_model(data)
-            except Exception as e:
-                st.warning(f"Lỗi khi huấn luyện mô hình cho {ticker}: {e}")
+        for ticker, result, messages in ChatGPT_def.train_models(df):
+            for message in messages:
+                st.warning(message)
+            if result is None:
                 continue
 
-            models[ticker] = (model, data, report, le)
+            models[ticker] = result
+
+        for ticker, (model, data, report, le, X_all) in models.items():
             latest = data.iloc[-1]
 
-            pred_encoded = model.predict([latest[['ma5', 'ma10', 'return_1d', 'return_5d', 'rsi', 'eps', 'roe']].values])[0]
+            # Each ticker has its own model, so it predicts on the last row of its own float32 features
+            pred_encoded = model.predict(X_all[-1:])[0]
             pred_label = le.inverse_transform([pred_encoded])[0]
 
             accuracy = report.get('accuracy', 0) * 100
@@ -58,15 +171,9 @@ class ChatGPT_def:
 
     @staticmethod
     def calculate_technical_indicators(data):
-        data['ma5'] = data['close'].rolling(window=5).mean()
-        data['ma10'] = data['close'].rolling(window=10).mean()
-        data['return_1d'] = data['close'].pct_change(1)
-        data['return_5d'] = data['close'].pct_change(5)
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        data['rsi'] = 100 - (100 / (1 + rs))
+        close = data['close'].to_numpy(np.float64)
+        data[['ma5', 'ma10', 'return_1d', 'return_5d']] = _price_features(close)
+        data['rsi'] = _rsi_wilder(close, 14)
         return data
 
     @staticmethod
@@ -92,8 +199,8 @@ class ChatGPT_def:
         return data
 
     @staticmethod
-    def train_model(data):
-        X = data[['ma5', 'ma10', 'return_1d', 'return_5d', 'rsi', 'eps', 'roe']]
+    def train_model(data, on_warning=st.warning):
+        X = data[list(FEATURE_COLS)].to_numpy(np.float32)
         y = data['action']
 
         if y.nunique() < 2:
@@ -106,7 +213,7 @@ class ChatGPT_def:
         min_class_count = class_counts.min()
 
         if min_class_count < 2:
-            st.warning("Một số lớp quá ít dữ liệu để phân chia train/test. Sẽ huấn luyện toàn bộ dữ liệu.")
+            on_warning("Một số lớp quá ít dữ liệu để phân chia train/test. Sẽ huấn luyện toàn bộ dữ liệu.")
             X_train, y_train = X, y_encoded
             X_test, y_test = X, y_encoded
         else:
@@ -120,7 +227,8 @@ class ChatGPT_def:
             max_depth=5,
             subsample=0.8,
             colsample_bytree=0.8,
-            use_label_encoder=False,
+            tree_method='hist',
+            n_jobs=1,  # joblib already runs one training per core
             eval_metric='mlogloss',
             random_state=42
         )
@@ -131,25 +239,12 @@ class ChatGPT_def:
 
     @staticmethod
     def run_backtest(data):
-        capital = 1.0
-        position = 0
-        capital_history = []
-
-        for i in range(len(data)):
-            action = data.iloc[i]['predicted_action']
-            price = data.iloc[i]['close']
-
-            if action == 'Buy' and position == 0:
-                position = capital / price
-                capital = 0
-            elif action == 'Sell' and position > 0:
-                capital = position * price
-                position = 0
-
-            current_value = capital if position == 0 else position * price
-            capital_history.append(current_value)
-
-        data['portfolio_value'] = capital_history
+        # Map the labels to int8 codes once so the loop compares integers, not strings
+        actions = np.fromiter(
+            (_ACTION_CODES.get(a, 0) for a in data['predicted_action'].to_numpy()),
+            dtype=np.int8, count=len(data)
+        )
+        data['portfolio_value'] = _backtest(actions, data['close'].to_numpy(np.float64))
         return data
 
 class ChatGPT_st:
@@ -165,10 +260,10 @@ class ChatGPT_st:
     def detail_tab(models):
         selected = st.selectbox("Chọn mã cổ phiếu", list(models.keys()))
     
-        model, data, report, le = models[selected]
+        model, data, report, le, X_all = models[selected]
         last_rows = data.tail(100).copy()
 
-        pred_encoded = model.predict(last_rows[['ma5', 'ma10', 'return_1d', 'return_5d', 'rsi', 'eps', 'roe']])
+        pred_encoded = model.predict(X_all[-100:])
         last_rows['predicted_action'] = le.inverse_transform(pred_encoded)
 
         accuracy = report.get('accuracy', 0) * 100
@@ -190,9 +285,9 @@ class ChatGPT_st:
         st.subheader("")
         selected_bt = st.selectbox("Chọn mã cổ phiếu để backtest", list(models.keys()), key="backtest_select")
 
-        model, data_bt, _, le = models[selected_bt]
+        model, data_bt, _, le, X_all = models[selected_bt]
         last_rows_bt = data_bt.tail(200).copy()
-        pred_encoded_bt = model.predict(last_rows_bt[['ma5', 'ma10', 'return_1d', 'return_5d', 'rsi', 'eps', 'roe']])
+        pred_encoded_bt = model.predict(X_all[-200:])
         last_rows_bt['predicted_action'] = le.inverse_transform(pred_encoded_bt)
 
         bt_result = ChatGPT_def.run_backtest(last_rows_bt)
@@ -206,9 +301,9 @@ class ChatGPT_st:
         st.subheader("Báo cáo")
         selected_report = st.selectbox("Chọn mã cổ phiếu để xem báo cáo", list(models.keys()), key="report_select")
         # for ticker in models:
-        #     _, _, report, _ = models[ticker]
+        #     _, _, report, _, _ = models[ticker]
         #     st.markdown(f"### {ticker}")
         #     st.json(report)
-        _, _, report, _ = models[selected_report]
+        _, _, report, _, _ = models[selected_report]
         st.markdown(f"### {selected_report}")
         st.json(report)
\ No newline at end of file
@@ -31,7 +31,9 @@ class PortfolioManagerV2:
         
         # Refresh button
         if st.sidebar.button("🔄 Refresh Portfolios", help="Refresh from all sources"):
+            from src.streamlit.streamlit_dashboard import clear_remote_cache
             st.cache_data.clear()
+            clear_remote_cache()
             st.rerun()
         
         # Show sources button
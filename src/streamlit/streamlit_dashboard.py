@@ -1,11 +1,73 @@
+import glob
+import hashlib
 import io
 import os
+import time
 import requests
 import streamlit as st
 import pandas as pd
-from src.constants import API_URL, DATA_HISTORY, GIST_URL_DH_HISTORY, GIST_URL_SAMPLE_HISTORY, GIST_URL_TH_HISTORY, DATA_DIR
+from src.constants import API_URL, DATA_HISTORY, GIST_URL_DH_HISTORY, GIST_URL_SAMPLE_HISTORY, GIST_URL_TH_HISTORY, DATA_DIR, PROJECT_DIR
 from src.tastock.data.data_manager import DataManager
 
+# Remote data is refreshed at most once per hour
+REMOTE_CACHE_TTL = 3600
+REMOTE_CACHE_DIR = os.path.join(PROJECT_DIR, '.cache')
+
+_session = requests.Session()
+
+def _disk_cache_path(url):
+    """Return the on-disk cache file for a remote URL"""
+    key = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return os.path.join(REMOTE_CACHE_DIR, f"{key}.parquet")
+
+def _read_disk_cache(url):
+    """Return the cached DataFrame for a URL if it is younger than the TTL"""
+    cache_file = _disk_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(cache_file) < REMOTE_CACHE_TTL:
+            return pd.read_parquet(cache_file)
+    except Exception:
+        pass
+    return None
+
+def _write_disk_cache(url, df):
+    """Persist a downloaded DataFrame so a restarted app skips the fetch"""
+    try:
+        os.makedirs(REMOTE_CACHE_DIR, exist_ok=True)
+        df.to_parquet(_disk_cache_path(url), index=False)
+    except Exception:
+        # The disk cache is best effort only
+        pass
+
+def clear_remote_cache():
+    """Delete the on-disk copies of remote data so the next fetch goes to the network"""
+    for cache_file in glob.glob(os.path.join(REMOTE_CACHE_DIR, '*.parquet')):
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+@st.cache_data(ttl=REMOTE_CACHE_TTL, show_spinner=False)
+def fetch_csv_url(url):
+    """Download and parse a CSV file, cached in memory and on disk"""
+    df = _read_disk_cache(url)
+    if df is None:
+        response = _session.get(url, timeout=30)
+        response.raise_for_status()
+        df = pd.read_csv(io.BytesIO(response.content))
+        _write_disk_cache(url, df)
+    return df
+
+@st.cache_data(ttl=REMOTE_CACHE_TTL, show_spinner=False)
+def fetch_api(url):
+    """Fetch JSON stock data from the API, cached in memory and on disk"""
+    df = _read_disk_cache(url)
+    if df is None:
+        response = _session.get(url, timeout=30)
+        df = pd.DataFrame(response.json())
+        _write_disk_cache(url, df)
+    return df
+
 class Streamlit_def:
 
     @staticmethod
@@ -47,8 +109,7 @@ class Streamlit_def:
                 url = csv_url
                 # st.info(f"Đang tải dữ liệu từ: {url}")
                 st.info(f"Đang tải dữ liệu từ: {url_name_to_display}")
-                response = requests.get(url)
-                df = pd.read_csv(io.StringIO(response.text))
+                df = fetch_csv_url(url)
             except Exception as e:
                 st.error(f"Không thể tải file CSV: {e}")
                 return pd.DataFrame()
@@ -67,9 +128,7 @@ class Streamlit_def:
         elif source == "API":
             try:
                 api_url = API_URL
-                response = requests.get(api_url)
-                json_data = response.json()
-                df = pd.DataFrame(json_data)
+                df = fetch_api(api_url)
             except Exception as e:
                 st.error(f"Không thể tải dữ liệu từ API: {e}")
                 return pd.DataFrame()
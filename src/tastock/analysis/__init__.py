@@ -6,5 +6,6 @@ from .technical_analysis import TechnicalAnalysis
 from .value_analysis import ValueAnalysis
 from .canslim_analysis import CANSLIMAnalysis
 from .decision_engine import DecisionEngine
+from .bizuni_analysis import BizUniAnalysis
 
-__all__ = ['TechnicalAnalysis', 'ValueAnalysis', 'CANSLIMAnalysis', 'DecisionEngine']
\ No newline at end of file
+__all__ = ['TechnicalAnalysis', 'ValueAnalysis', 'CANSLIMAnalysis', 'DecisionEngine', 'BizUniAnalysis']
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+BizUni safety-margin categorization shared by the dashboard and the Parquet converter.
+"""
+
+import re
+import pandas as pd
+import numpy as np
+from typing import Optional, Tuple
+
+# Quotes, commas, percentage signs and HTML apostrophes around BizUni numbers
+NUMERIC_NOISE_RE = re.compile(r'[,"%]|&#39;')
+
+BIZUNI_CATEGORIES = ['min', 'med', 'max']
+
+class BizUniAnalysis:
+
+    @staticmethod
+    def extract_numeric(values: pd.Series) -> pd.Series:
+        """Parse BizUni text values such as '12,5%' to floats, using 0 for blanks and unparsable cells"""
+        cleaned = values.astype('string').str.replace(NUMERIC_NOISE_RE, '', regex=True).str.strip()
+        return pd.to_numeric(cleaned, errors='coerce').fillna(0.0)
+
+    @staticmethod
+    def split_points(safety_margin: pd.Series) -> Tuple[Optional[float], Optional[float]]:
+        """33rd/67th percentiles of the non-zero safety margins, or (None, None) if there are none"""
+        margin = safety_margin.to_numpy()
+        valid_margins = margin[margin != 0]
+        if valid_margins.size == 0:
+            return None, None
+        # Both split points from one partition of the margins
+        q33, q67 = np.quantile(valid_margins, [0.33, 0.67])
+        return float(q33), float(q67)
+
+    @staticmethod
+    def categorize(bizuni_df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[float], Optional[float]]:
+        """Add safety_margin (from column 5) and its min/med/max category, returning the split points too"""
+        bizuni_df['safety_margin'] = BizUniAnalysis.extract_numeric(bizuni_df.iloc[:, 5])
+        q33, q67 = BizUniAnalysis.split_points(bizuni_df['safety_margin'])
+
+        margin = bizuni_df['safety_margin'].to_numpy()
+        if q33 is not None:
+            # Missing margins (0) stay 'med'; otherwise split at the 33rd/67th percentiles
+            category = np.select(
+                [margin == 0, margin >= q67, margin <= q33],
+                ['med', 'max', 'min'],
+                default='med'
+            )
+        else:
+            category = np.full(len(bizuni_df), 'med')
+        bizuni_df['category'] = pd.Categorical(category, categories=BIZUNI_CATEGORIES)
+        return bizuni_df, q33, q67
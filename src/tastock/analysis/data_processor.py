@@ -2,16 +2,32 @@
 Data processor to enhance CafeF crawler data with missing metrics
 """
 import asyncio
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 
 class DataProcessor:
     
-    def __init__(self, cafef_crawler):
+    def __init__(self, cafef_crawler, vnindex_data: Optional[List[Dict]] = None):
         self.crawler = cafef_crawler
+        # VN-Index history is fetched at most once per processor; concurrent callers await the same task
+        self._vnindex_data = vnindex_data
+        self._vnindex_task = None
     
     async def get_vnindex_data(self) -> List[Dict]:
         """Get VN-Index data for market direction analysis"""
+        if self._vnindex_data is None:
+            if self._vnindex_task is None:
+                self._vnindex_task = asyncio.ensure_future(self._fetch_vnindex_data())
+            vnindex_data = await self._vnindex_task
+            if not vnindex_data:
+                # Failed fetches are not cached, so the next call retries
+                self._vnindex_task = None
+                return vnindex_data
+            self._vnindex_data = vnindex_data
+        return self._vnindex_data
+    
+    async def _fetch_vnindex_data(self) -> List[Dict]:
+        """Fetch VN-Index price data from CafeF"""
         try:
             vnindex_data = await self.crawler.get_stock_data('VNINDEX')
             return vnindex_data.get('price_data', [])
@@ -490,23 +490,28 @@ async def crawl_bizuni_data():
         filename = await crawler.crawl_stock_data()
         return filename
 
-def main():
-    """Main function to handle command line arguments"""
-    import sys
+def main(argv=None) -> int:
+    """Main function to handle command line arguments (crawls when called without any)"""
+    # Only the script entry point reads sys.argv; library callers such as the workflow get the default command
+    if argv is None:
+        argv = []
     
-    command = sys.argv[1].lower() if len(sys.argv) > 1 else "crawl"
+    command = argv[0].lower() if argv else "crawl"
     
     if command == "crawl":
         print("\n=== 📥 Starting data crawl... ===")
         try:
             filename = asyncio.run(crawl_bizuni_data())
             print(f"\n=> ✅ Successfully crawled data to: {filename}")
+            return 0
         except Exception as e:
             print(f"\n=> ❌ Crawling failed: {e}")
+            return 1
     
     else:
         print(f"\n=== ❌ Unknown command: {command} ===")
         print("Available commands: crawl")
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
@@ -4,13 +4,15 @@ Data Downloader Module
 This module provides classes for downloading CafeF data and orchestrating download workflows.
 """
 
+import os
 import shutil
 import requests
 import zipfile
 import pandas as pd
 from datetime import datetime, timedelta, date
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 from email.message import Message
 
@@ -22,7 +24,7 @@ class DataDownloader:
     
     CAFEF_STOCK_URL_TEMPLATE = "https://cafef1.mediacdn.vn/data/ami_data/{date_yyyymmdd}/CafeF.SolieuGD.Upto{date_ddmmyyyy}.zip"
     CAFEF_INDEX_URL_TEMPLATE = "https://cafef1.mediacdn.vn/data/ami_data/{date_yyyymmdd}/CafeF.Index.Upto{date_ddmmyyyy}.zip"
-    DEFAULT_CHUNK_SIZE = 8192
+    DEFAULT_CHUNK_SIZE = 1 << 20
     
     def __init__(self, download_dir: str):
         self.download_dir = Path(download_dir)
@@ -107,9 +109,7 @@ class DataDownloader:
                 filename = self._get_filename_from_response(response, url)
                 downloaded_file = self.download_dir / filename
                 
-                with open(downloaded_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=self.DEFAULT_CHUNK_SIZE):
-                        f.write(chunk)
+                self._stream_to_file(response, downloaded_file)
                 
                 print(f"Downloaded index data: {downloaded_file}")
                 
@@ -180,9 +180,7 @@ class DataDownloader:
                 filename = self._get_filename_from_response(response, url)
                 downloaded_file = self.download_dir / filename
                 
-                with open(downloaded_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=self.DEFAULT_CHUNK_SIZE):
-                        f.write(chunk)
+                self._stream_to_file(response, downloaded_file)
                 
                 print(f"Downloaded: {downloaded_file}")
                 
@@ -235,13 +233,49 @@ class DataDownloader:
         
         return False
     
+    def _stream_to_file(self, response: requests.Response, file_path: Path):
+        """Write a streamed response to disk without buffering it in memory"""
+        response.raw.decode_content = True
+        try:
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=self.DEFAULT_CHUNK_SIZE)
+        finally:
+            response.close()
+        
+        # CafeF publishes no checksums, so compare the size here; extraction checks each member's CRC-32
+        expected_size = response.headers.get('Content-Length')
+        if expected_size and 'Content-Encoding' not in response.headers:
+            actual_size = file_path.stat().st_size
+            if actual_size != int(expected_size):
+                file_path.unlink()
+                raise IOError(f"Incomplete download {file_path.name}: {actual_size} of {expected_size} bytes")
+    
+    @staticmethod
+    def _extract_member(zip_file: Path, member: zipfile.ZipInfo, extract_dir: Path):
+        # Each worker opens its own handle so members are decompressed independently
+        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            zip_ref.extract(member, extract_dir)
+    
     def _extract_existing_zip(self, zip_file: Path, extract_dir: Path) -> Tuple[bool, Optional[Path]]:
         """Extract existing zip file"""
         try:
             self._ensure_directory_exists(extract_dir, clean_if_exists=True)
             
             with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
+                members = [member for member in zip_ref.infolist() if not member.is_dir()]
+                
+                # zipfile creates member directories without exist_ok, so create them all before extracting in parallel
+                for member in zip_ref.infolist():
+                    path = PurePosixPath(member.filename)
+                    parts = path.parts if member.is_dir() else path.parent.parts
+                    extract_dir.joinpath(*[p for p in parts if p not in ('', '.', '..', '/')]).mkdir(parents=True, exist_ok=True)
+            
+            if len(members) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(members), os.cpu_count() or 1)) as executor:
+                    list(executor.map(lambda m: self._extract_member(zip_file, m, extract_dir), members))
+            else:
+                with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                    zip_ref.extractall(extract_dir)
             
             print(f"Extracted to: {extract_dir}")
             return True, extract_dir
@@ -253,7 +287,7 @@ class DataDownloader:
 class DataWorkflowDownload:
     """Main workflow orchestrator for download-based data processing"""
     
-    def __init__(self, download_dir: str = None, data_dir: str = None):
+    def __init__(self, download_dir: str = None, data_dir: str = None, use_parquet: bool = False):
         if download_dir is None:
             from pathlib import Path
             script_dir = Path(__file__).resolve().parent.parent / "scripts"
@@ -263,8 +297,8 @@ class DataWorkflowDownload:
             data_dir = DEFAULT_OUTPUT_DIR
         
         self.downloader = DataDownloader(download_dir)
-        self.processor = StructuredDataProcessor(data_dir)
-        self.copier = FileCopier(data_dir, data_dir)
+        self.processor = StructuredDataProcessor(data_dir, use_parquet=use_parquet)
+        self.copier = FileCopier(data_dir, data_dir, use_parquet=use_parquet)
     
     def run_full_workflow(self, target_date: Optional[date] = None, symbols: list = None, portfolio_name: str = 'VN30') -> bool:
         """Run the complete workflow"""
@@ -321,6 +355,23 @@ class DataWorkflowDownload:
         except KeyboardInterrupt:
             print("\nScheduler stopped")
     
+    def _merged_file(self, portfolio_folder: Path, stem: str) -> Path:
+        """Return the portfolio merged file, preferring Parquet when it is at least as new as the CSV"""
+        parquet_file = portfolio_folder / f'{stem}.parquet'
+        csv_file = portfolio_folder / f'{stem}.csv'
+        if not parquet_file.exists():
+            return csv_file
+        # A Parquet file left over from an earlier use_parquet run must not shadow a fresher CSV
+        if csv_file.exists() and csv_file.stat().st_mtime > parquet_file.stat().st_mtime:
+            return csv_file
+        return parquet_file
+    
+    def _read_merged_file(self, file_path: Path) -> pd.DataFrame:
+        """Read a portfolio merged file written as Parquet or CSV"""
+        if file_path.suffix == '.parquet':
+            return pd.read_parquet(file_path)
+        return pd.read_csv(file_path)
+    
     def merge_all_portfolios_to_root(self) -> bool:
         """Merge all portfolios data from latest date folder to root history file"""
         try:
@@ -345,10 +396,10 @@ class DataWorkflowDownload:
             
             # Collect data from all portfolios
             for portfolio_folder in portfolio_folders:
-                history_file = portfolio_folder / 'history_data_all_symbols.csv'
+                history_file = self._merged_file(portfolio_folder, 'history_data_all_symbols')
                 if history_file.exists():
                     try:
-                        df = pd.read_csv(history_file)
+                        df = self._read_merged_file(history_file)
                         if 'time' in df.columns:
                             df = df.set_index('time')
                             # Add all symbol columns to combined data
@@ -371,7 +422,7 @@ class DataWorkflowDownload:
             merged_df = merged_df.fillna(0)
             
             # Sort by date chronologically
-            merged_df['time'] = pd.to_datetime(merged_df['time'])
+            merged_df['time'] = pd.to_datetime(merged_df['time'], format='%Y-%m-%d', cache=True)
             merged_df = merged_df.sort_values('time')
             merged_df['time'] = merged_df['time'].dt.strftime('%Y-%m-%d')
             
@@ -425,10 +476,10 @@ class DataWorkflowDownload:
             
             # Collect performance data from all portfolios
             for portfolio_folder in portfolio_folders:
-                perf_file = portfolio_folder / 'perf_all_symbols.csv'
+                perf_file = self._merged_file(portfolio_folder, 'perf_all_symbols')
                 if perf_file.exists():
                     try:
-                        df = pd.read_csv(perf_file)
+                        df = self._read_merged_file(perf_file)
                         if not df.empty:
                             all_perf_data.append(df)
                         print(f"Added perf data from {portfolio_folder.name}: {len(df)} symbols")
@@ -275,22 +275,28 @@ class DataManager:
         
         stock_data = {}
         
-        # Get all CSV files in the folder
-        csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
+        # Get all CSV and Parquet files in the folder
+        data_files = glob.glob(os.path.join(folder_path, "*.csv")) + glob.glob(os.path.join(folder_path, "*.parquet"))
         
-        for file_path in csv_files:
+        for file_path in data_files:
             try:
                 print(f"  📂 Processing file: {os.path.basename(file_path)}")
-                # Read CSV file with optimized settings for large files
-                df = pd.read_csv(file_path, dtype={
-                    '<Ticker>': 'string',
-                    '<DTYYYYMMDD>': 'string',
-                    '<Open>': 'float64',
-                    '<High>': 'float64', 
-                    '<Low>': 'float64',
-                    '<Close>': 'float64',
-                    '<Volume>': 'int64'
-                })
+                if file_path.endswith('.parquet'):
+                    # Parquet files keep their column types, no dtype hints needed
+                    df = pd.read_parquet(file_path)
+                    df['<DTYYYYMMDD>'] = df['<DTYYYYMMDD>'].astype('string')
+                    df['<Ticker>'] = df['<Ticker>'].astype('category')
+                else:
+                    # Read CSV file with optimized settings for large files
+                    df = pd.read_csv(file_path, dtype={
+                        '<Ticker>': 'category',  # few distinct tickers repeated over millions of rows
+                        '<DTYYYYMMDD>': 'string',
+                        '<Open>': 'float64',
+                        '<High>': 'float64', 
+                        '<Low>': 'float64',
+                        '<Close>': 'float64',
+                        '<Volume>': 'int64'
+                    })
                 
                 # Filter symbols if specified, but always include VNAll-INDEX
                 if symbols_filter:
@@ -340,7 +346,8 @@ class DataManager:
                         df = df[df['time'] <= end_date]
                 
                 # Group by symbol and create separate DataFrames
-                for symbol, group_df in df.groupby('symbol'):
+                # observed=True skips tickers that were filtered out but remain as categories
+                for symbol, group_df in df.groupby('symbol', observed=True):
                     # Sort by time and reset index
                     symbol_df = group_df.drop('symbol', axis=1).sort_values('time').reset_index(drop=True)
                     
@@ -33,9 +33,11 @@ from src.constants import SYMBOLS_VN30
 class StructuredDataProcessor:
     """Handles data processing with structured folder output"""
     
-    def __init__(self, base_output_dir: str = 'data'):
+    def __init__(self, base_output_dir: str = 'data', use_parquet: bool = False):
         self.data_manager = DataManager(base_output_dir=base_output_dir)
         self.base_output_dir = Path(base_output_dir)
+        # Write the internal merged files (history_data_all_symbols / perf_all_symbols) as Parquet
+        self.use_parquet = use_parquet
     
     # API processing moved to fetch script - not shared
     
@@ -127,17 +129,22 @@ class StructuredDataProcessor:
                     except Exception as e:
                         print(f"Error processing {symbol}: {e}")
             
+            # Build the merged frames once; they are written to both the symbols and portfolio folders
+            history_df = self._build_portfolio_history(stock_data)
+            metrics_df = self._build_performance_metrics(performance_metrics)
+            
             # Save portfolio history file
-            portfolio_history_file = symbols_folder / f"history_{portfolio_name}_{current_date}.csv"
-            self._save_portfolio_history(stock_data, portfolio_history_file)
+            if history_df is not None:
+                portfolio_history_file = symbols_folder / f"history_{portfolio_name}_{current_date}.csv"
+                self._write_df(history_df, portfolio_history_file)
             
             # Save performance metrics file
-            if performance_metrics:
+            if metrics_df is not None:
                 perf_file = symbols_folder / f"perf_{portfolio_name}_{current_date}.csv"
-                self._save_performance_metrics(performance_metrics, perf_file)
+                self._write_df(metrics_df, perf_file)
             
             # Save merged files in portfolio folder
-            self._save_merged_files(stock_data, performance_metrics, portfolio_folder)
+            self._save_merged_files(history_df, metrics_df, portfolio_folder)
             
             print(f"Data saved to structured folders under: {date_folder}")
             return True
@@ -146,81 +153,84 @@ class StructuredDataProcessor:
             print(f"Structured processing failed: {e}")
             return False
     
-    def _save_portfolio_history(self, stock_data: dict, file_path: Path):
-        """Save portfolio history CSV with VNINDEX first, then alphabetically sorted"""
+    def _build_portfolio_history(self, stock_data: dict) -> Optional[pd.DataFrame]:
+        """Build the portfolio close-price history with VNINDEX first, then alphabetically sorted"""
         # Sort symbols: VNINDEX first, then alphabetically
         sorted_symbols = sorted(stock_data.keys())
         if 'VNINDEX' in sorted_symbols:
             sorted_symbols.remove('VNINDEX')
             sorted_symbols.insert(0, 'VNINDEX')
         
-        dfs = []
+        # One close-price Series per symbol indexed by time; no intermediate frame copies
+        closes = []
         for symbol in sorted_symbols:
             df = stock_data[symbol]
             if not df.empty and 'time' in df.columns and 'close' in df.columns:
-                temp_df = df[['time', 'close']].copy()
-                temp_df['time'] = temp_df['time'].astype(str)
-                temp_df = temp_df.rename(columns={'close': symbol})
-                dfs.append(temp_df.set_index('time'))
+                closes.append(pd.Series(df['close'].to_numpy(), index=df['time'].astype(str), name=symbol))
         
-        if dfs:
-            merged_df = pd.concat(dfs, axis=1, join='outer').reset_index()
-            merged_df = merged_df.rename(columns={'index': 'time'})
-            
-            # Fill missing values with 0 for all columns except time
-            for col in merged_df.columns:
-                if col != 'time':
-                    merged_df[col] = merged_df[col].fillna(0)
-            
-            # Sort by date chronologically
-            merged_df['time'] = pd.to_datetime(merged_df['time'])
-            merged_df = merged_df.sort_values('time')
-            merged_df['time'] = merged_df['time'].dt.strftime('%Y-%m-%d')
-            
-            # Handle VNINDEX zeros by using previous non-zero value
-            if 'VNINDEX' in merged_df.columns:
-                merged_df['VNINDEX'] = merged_df['VNINDEX'].replace(0, pd.NA).ffill()
-            
-            merged_df.to_csv(file_path, index=False)
-    
-    def _save_performance_metrics(self, performance_metrics: dict, file_path: Path):
-        """Save performance metrics CSV"""
-        metrics_list = []
-        for symbol, metrics in performance_metrics.items():
-            metrics_row = {'symbol': symbol}
-            metrics_row.update(metrics)
-            metrics_list.append(metrics_row)
+        if not closes:
+            return None
+        
+        # Fill missing values with 0 while time is still the index, so one fillna covers every symbol
+        merged_df = pd.concat(closes, axis=1, join='outer').fillna(0).rename_axis('time').reset_index()
         
-        if metrics_list:
-            metrics_df = pd.DataFrame(metrics_list)
-            metrics_df.to_csv(file_path, index=False)
+        # Sort by date chronologically
+        merged_df['time'] = pd.to_datetime(merged_df['time'], format='%Y-%m-%d', cache=True)
+        merged_df = merged_df.sort_values('time')
+        merged_df['time'] = merged_df['time'].dt.strftime('%Y-%m-%d')
+        
+        # Handle VNINDEX zeros by using previous non-zero value
+        if 'VNINDEX' in merged_df.columns:
+            merged_df['VNINDEX'] = merged_df['VNINDEX'].replace(0, pd.NA).ffill()
+        
+        return merged_df
+    
+    def _build_performance_metrics(self, performance_metrics: dict) -> Optional[pd.DataFrame]:
+        """Build the performance metrics frame, one row per symbol"""
+        if not performance_metrics:
+            return None
+        return (pd.DataFrame.from_dict(performance_metrics, orient='index')
+                .rename_axis('symbol').reset_index())
     
-    def _save_merged_files(self, stock_data: dict, performance_metrics: dict, portfolio_folder: Path):
+    def _write_df(self, df: pd.DataFrame, file_path: Path):
+        """Write a DataFrame as Parquet or CSV depending on the file suffix"""
+        if file_path.suffix == '.parquet':
+            df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+        else:
+            # The CSVs are committed and read back by the dashboard, so keep the pandas writer's exact formatting
+            df.to_csv(file_path, index=False)
+    
+    def _save_merged_files(self, history_df: Optional[pd.DataFrame], metrics_df: Optional[pd.DataFrame], portfolio_folder: Path):
         """Save merged files in portfolio folder"""
+        suffix = '.parquet' if self.use_parquet else '.csv'
+        
         # Save merged history
-        history_file = portfolio_folder / 'history_data_all_symbols.csv'
-        self._save_portfolio_history(stock_data, history_file)
+        if history_df is not None:
+            history_file = portfolio_folder / f'history_data_all_symbols{suffix}'
+            self._write_df(history_df, history_file)
         
         # Save merged performance metrics
-        if performance_metrics:
-            perf_file = portfolio_folder / 'perf_all_symbols.csv'
-            self._save_performance_metrics(performance_metrics, perf_file)
+        if metrics_df is not None:
+            perf_file = portfolio_folder / f'perf_all_symbols{suffix}'
+            self._write_df(metrics_df, perf_file)
 
 # DataFetcher functionality integrated into StructuredDataProcessor
 
 class FileCopier:
     """Handles copying latest files to root data folder"""
     
-    def __init__(self, source_dir: str = 'data', target_dir: str = 'data'):
+    def __init__(self, source_dir: str = 'data', target_dir: str = 'data', use_parquet: bool = False):
         self.source_dir = Path(source_dir)
         self.target_dir = Path(target_dir)
+        self.use_parquet = use_parquet
     
     def copy_latest_files(self) -> bool:
-        """Copy latest CSV files to root data folder"""
+        """Copy latest merged files to root data folder"""
         try:
+            suffix = '.parquet' if self.use_parquet else '.csv'
             files_to_copy = [
-                'history_data_all_symbols.csv',
-                'perf_all_symbols.csv'
+                f'history_data_all_symbols{suffix}',
+                f'perf_all_symbols{suffix}'
             ]
             
             for filename in files_to_copy:
@@ -243,12 +253,22 @@ class FileCopier:
     
     def _find_latest_file(self, filename: str) -> Optional[Path]:
         """Find the latest version of a file in dated folders"""
-        pattern = f"*/*/{filename}"
-        matching_files = list(self.source_dir.glob(pattern))
+        # Date folders are named YYYYMMDD, so the newest one sorts last
+        with os.scandir(self.source_dir) as entries:
+            date_dirs = sorted(
+                (e.name for e in entries if e.is_dir() and e.name.isdigit() and len(e.name) == 8),
+                reverse=True
+            )
         
-        if matching_files:
-            latest_file = max(matching_files, key=lambda f: f.stat().st_mtime)
-            return latest_file
+        for date_dir in date_dirs:
+            with os.scandir(self.source_dir / date_dir) as entries:
+                candidates = [
+                    Path(e.path) / filename for e in entries
+                    if e.is_dir() and (Path(e.path) / filename).exists()
+                ]
+            if candidates:
+                # Only the newest date folder needs an mtime comparison between portfolios
+                return max(candidates, key=lambda f: f.stat().st_mtime)
         
         return None
 
@@ -282,7 +302,8 @@ class DataFileManager:
             base_dir = Path(base_output_dir)
             
             # Find all date folders (8-digit numeric folder names)
-            date_folders = [d for d in base_dir.iterdir() if d.is_dir() and d.name.isdigit() and len(d.name) == 8]
+            with os.scandir(base_dir) as entries:
+                date_folders = [Path(e.path) for e in entries if e.is_dir() and e.name.isdigit() and len(e.name) == 8]
             
             if len(date_folders) <= keep_count:
                 print(f"Found {len(date_folders)} date folders, no cleanup needed (keeping {keep_count})")
@@ -7,6 +7,7 @@ import smtplib
 import os
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 import logging
 
@@ -14,6 +15,8 @@ class NotificationService:
     def __init__(self, config: Dict = None):
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
+        # Reused across sends so each channel keeps its connection alive
+        self.session = requests.Session()
         
     def send_telegram(self, message: str, parse_mode: str = "HTML") -> bool:
         """Send message via Telegram Bot"""
@@ -31,7 +34,7 @@ class NotificationService:
                 "text": message,
                 "parse_mode": parse_mode
             }
-            response = requests.post(url, data=data, timeout=10)
+            response = self.session.post(url, data=data, timeout=10)
             return response.status_code == 200
         except Exception as e:
             self.logger.error(f"Telegram send failed: {e}")
@@ -47,7 +50,7 @@ class NotificationService:
             
         try:
             data = {"content": message}
-            response = requests.post(webhook_url, json=data, timeout=10)
+            response = self.session.post(webhook_url, json=data, timeout=10)
             return response.status_code == 204
         except Exception as e:
             self.logger.error(f"Discord send failed: {e}")
@@ -98,7 +101,7 @@ class NotificationService:
                 "message": message,
                 "title": title
             }
-            response = requests.post("https://api.pushover.net/1/messages.json", data=data, timeout=10)
+            response = self.session.post("https://api.pushover.net/1/messages.json", data=data, timeout=10)
             return response.status_code == 200
         except Exception as e:
             self.logger.error(f"Pushover send failed: {e}")
@@ -125,6 +128,59 @@ class NotificationService:
         
         return results
     
+    def send_batch(self, signals: List[Dict]) -> Dict[str, bool]:
+        """Send one message listing all signals via each configured channel"""
+        if not signals:
+            return {}
+        
+        # Format messages
+        telegram_msg = self._format_batch_message(signals, "<b>", "</b>")
+        discord_msg = self._format_batch_message(signals, "**", "**")
+        email_msg = self._format_batch_email(signals)
+        pushover_msg = ", ".join(f"{s.get('signal', 'HOLD')} {s.get('stock_code', 'Unknown')} ({s.get('confidence', 0)}%)" for s in signals)
+        
+        # One request per channel, sent concurrently
+        sends = {
+            'telegram': lambda: self.send_telegram(telegram_msg),
+            'discord': lambda: self.send_discord(discord_msg),
+            'email': lambda: self.send_email(f"TAstock Alert: {len(signals)} signals", email_msg),
+            'pushover': lambda: self.send_pushover(pushover_msg)
+        }
+        with ThreadPoolExecutor(max_workers=len(sends)) as executor:
+            futures = {channel: executor.submit(send) for channel, send in sends.items()}
+            return {channel: future.result() for channel, future in futures.items()}
+    
+    def _format_batch_message(self, signals: List[Dict], bold_open: str, bold_close: str) -> str:
+        """Format a multi-signal message for Telegram (HTML) or Discord (Markdown) bold markers"""
+        lines = [f"📢 {bold_open}TAstock Alert{bold_close} - {len(signals)} signals", ""]
+        for s in signals:
+            signal = s.get('signal', 'HOLD')
+            emoji = "🚀" if signal == "BUY" else "🔻" if signal == "SELL" else "⏸️"
+            lines.append(f"{emoji} {bold_open}{s.get('stock_code', 'Unknown')}{bold_close} {signal} | "
+                         f"📊 {s.get('confidence', 0)}% | 💰 {s.get('price', 0):,.0f} VND")
+        lines += ["", f"⏰ {self._get_timestamp()}"]
+        return "\n".join(lines)
+    
+    def _format_batch_email(self, signals: List[Dict]) -> str:
+        """Format HTML email listing all signals"""
+        rows = "".join(
+            f"<tr><td>{s.get('stock_code', 'Unknown')}</td><td>{s.get('signal', 'HOLD')}</td>"
+            f"<td>{s.get('confidence', 0)}%</td><td>{s.get('price', 0):,.0f} VND</td></tr>"
+            for s in signals
+        )
+        return f"""
+        <html>
+        <body style="font-family: Arial, sans-serif;">
+            <h2>TAstock Investment Alert</h2>
+            <table style="border-collapse: collapse; width: 100%;">
+                <tr><th>Stock</th><th>Signal</th><th>Confidence</th><th>Price</th></tr>
+                {rows}
+            </table>
+            <p>Time: {self._get_timestamp()}</p>
+        </body>
+        </html>
+        """
+    
     def _format_telegram_message(self, stock_code: str, signal: str, confidence: int, price: float) -> str:
         """Format message for Telegram"""
         emoji = "🚀" if signal == "BUY" else "🔻" if signal == "SELL" else "⏸️"
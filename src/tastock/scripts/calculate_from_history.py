@@ -12,7 +12,7 @@ from src.constants import SYMBOLS_VN30, SYMBOLS_VN100, SYMBOLS_DH, SYMBOLS_TH, D
 from src.tastock.data.data_calculator import DataCalculator
 from src.tastock.data.data_storage import DataStorage
 
-def main():
+def main() -> int:
     """Calculate metrics from history data."""
     calculator = DataCalculator()
     storage = DataStorage(base_output_dir=DEFAULT_OUTPUT_DIR)
@@ -31,10 +31,10 @@ def main():
         print(f"Saved performance metrics to: {perf_file}")
         
         print(f"✅ Processed {len(metrics)} symbols from history data")
-        
+        return 0
 
-    else:
-        print("❌ No metrics calculated")
+    print("❌ No metrics calculated")
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Convert Dashboard Data to Parquet
+
+This script writes Parquet copies of the CSV files the dashboard reads on every rerun,
+so the app can load typed columnar data instead of re-tokenizing the CSVs.
+The BizUni copy also carries the computed safety_margin and category columns.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.constants import DATA_DIR
+from src.tastock.analysis.bizuni_analysis import BizUniAnalysis
+
+# CSV files in the root data folder that get a Parquet copy next to them
+DASHBOARD_FILES = ['bizuni_cpgt.csv', 'investment_signals_complete.csv']
+
+# Columns derived before writing, so the dashboard does no string work on load
+PREPARE = {
+    'bizuni_cpgt.csv': lambda df: BizUniAnalysis.categorize(df)[0]
+}
+
+def convert_to_parquet(csv_path: Path) -> Path:
+    """Write a Parquet copy of csv_path alongside it and return the new path"""
+    parquet_path = csv_path.with_suffix('.parquet')
+    df = pd.read_csv(csv_path)
+    if csv_path.name in PREPARE:
+        df = PREPARE[csv_path.name](df)
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    return parquet_path
+
+def main() -> int:
+    """Convert the dashboard CSV files to Parquet."""
+    converted = 0
+    for filename in DASHBOARD_FILES:
+        csv_path = Path(DATA_DIR) / filename
+        if not csv_path.exists():
+            print(f"⚠️ Skipping missing file: {csv_path}")
+            continue
+        try:
+            parquet_path = convert_to_parquet(csv_path)
+            print(f"✅ Converted {csv_path.name} -> {parquet_path.name}")
+            converted += 1
+        except Exception as e:
+            print(f"❌ Failed to convert {csv_path.name}: {e}")
+            return 1
+
+    print(f"Converted {converted} of {len(DASHBOARD_FILES)} dashboard files")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
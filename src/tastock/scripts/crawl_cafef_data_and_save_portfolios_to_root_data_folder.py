@@ -33,7 +33,7 @@ def load_portfolios_prefer_constants():
     except Exception:
         return {}, "FALLBACK_EMPTY"
 
-def main():
+def main() -> int:
     """Main function"""
     workflow = DataWorkflowDownload()
 
@@ -73,6 +73,7 @@ def main():
 
     # Uncomment to schedule daily runs
     # workflow.schedule_workflow("09:00", symbols=SYMBOLS_VN100, portfolio_name='VN100')
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
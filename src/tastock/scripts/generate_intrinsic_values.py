@@ -7,6 +7,7 @@ Creates intrinsic value estimates for stocks based on performance data.
 
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
 def calculate_intrinsic_value(row):
@@ -38,7 +39,7 @@ def calculate_intrinsic_value(row):
     except Exception:
         return 0.0
 
-def main():
+def main() -> int:
     """Generate intrinsic values from performance data"""
     
     # Get script directory and project root
@@ -51,7 +52,7 @@ def main():
     if not os.path.exists(perf_file):
         print(f"❌ Performance file not found: {perf_file}")
         print("Please run calculate_from_history.py first")
-        return
+        return 1
     
     df = pd.read_csv(perf_file)
     print(f"📊 Loaded {len(df)} symbols from performance data")
@@ -86,6 +87,7 @@ def main():
     # Show summary
     avg_intrinsic = intrinsic_df['intrinsic_value'].mean()
     print(f"📈 Average intrinsic value: {avg_intrinsic:.2f}")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import sys
 
 def calculate_market_direction(vnindex_row):
     """Calculate market direction from VN-Index data"""
@@ -293,7 +294,7 @@ def generate_combined_signal(value_signal, canslim_signal, technical_signal):
         'confidence': min(100, abs(total_score) * 25)  # Confidence level
     }
 
-def main():
+def main() -> int:
     """Generate investment signals from existing performance data"""
     
     # Get script directory and project root
@@ -303,7 +304,6 @@ def main():
     # Show portfolio source information
     print("\n=== PORTFOLIO SOURCE CHECK ===")
     try:
-        import sys
         sys.path.append(project_root)
         from src.portfolio_loader_csv import get_portfolios_csv as get_portfolios
         from src.constants import PORTFOLIOS
@@ -327,7 +327,7 @@ def main():
     
     if not os.path.exists(perf_file):
         print(f"❌ File not found: {perf_file}")
-        return
+        return 1
     
     df = pd.read_csv(perf_file)
     print(f"📊 Loaded {len(df)} symbols from {perf_file}")
@@ -473,6 +473,7 @@ def main():
     
     print(f"\n💾 Results saved to: {output_file}")
     print(f"📁 File size: {os.path.getsize(output_file)/1024:.1f} KB")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -57,7 +57,6 @@ class TAstock_def:
 
         # Convert 'time' from YYYYMMDD integer to datetime objects
         try:
-            stock_df = stock_df.copy()
             stock_df['time'] = pd.to_datetime(stock_df['time']) # More robust if already datetime
         except Exception as e:
             st.error(f"Lỗi khi chuyển đổi cột 'time' sang định dạng ngày tháng cho biểu đồ: {e}.")
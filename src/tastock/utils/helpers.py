@@ -6,7 +6,8 @@ This module provides helper functions for data processing and file management.
 
 import os
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from src.constants import DEFAULT_OUTPUT_DIR, DEFAULT_PERIOD, DEFAULT_START_DATE, DEFAULT_END_DATE, DEFAULT_USE_SUB_DIR
 
 class Helpers():    
@@ -64,7 +65,13 @@ class Helpers():
         END_DATE is last weekday (Friday if today is Sat/Sun).
         START_DATE is END_DATE minus `periods` weekdays.
         """
-        today = datetime.today()
+        # Keyed on today's date so the cached range rolls over at midnight
+        return Helpers._start_end_dates_for(period, date.today().toordinal())
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _start_end_dates_for(period, today_ordinal):
+        today = date.fromordinal(today_ordinal)
         if today.weekday() == 5:  # Saturday
             end_date = today - timedelta(days=1)
         elif today.weekday() == 6:  # Sunday
@@ -7,44 +7,76 @@ Executes the complete stock data update workflow:
 2. Performance Analysis - Calculate historical metrics
 3. Investment Signals - Generate trading recommendations
 4. Market Data Enhancement - Fetch additional insights
+5. Parquet Conversion - Typed copies of the dashboard CSV files
 """
 
+import contextlib
+import importlib
+import io
 import subprocess
 import sys
 import os
 from datetime import datetime
 import logging
 
-# Setup logging
+# Add project root to path so the pipeline stages can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+# Setup logging; captured stage output already reached the console, so it only goes to the file
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.addFilter(lambda record: not getattr(record, 'stage_output', False))
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('workflow_execution.log'),
-        logging.StreamHandler(sys.stdout)
+        console_handler
     ]
 )
 
-def run_script(script_path, description, optional=False):
-    """Execute a Python script and handle errors"""
+class _TeeOutput(io.StringIO):
+    """Buffer a stage's printed output while still passing it through to the console"""
+    
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+    
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+def log_stage_output(output):
+    """Write a stage's captured output to workflow_execution.log"""
+    if output.getvalue():
+        logging.info(f"Output: {output.getvalue()}", extra={'stage_output': True})
+
+def run_stage(module_name, description, optional=False):
+    """Import a pipeline stage and run its main() in-process, handling errors"""
     logging.info(f"▶️ Starting: {description}")
-    logging.info(f"Executing: {script_path}")
+    logging.info(f"Executing: {module_name}.main()")
     
+    # Keep the stage's output for workflow_execution.log, as when stages ran as subprocesses
+    output = _TeeOutput(sys.stdout)
     try:
-        result = subprocess.run([sys.executable, script_path], 
-                              capture_output=True, text=True, check=True)
+        with contextlib.redirect_stdout(output):
+            # Import lazily so a missing optional dependency only fails its own stage
+            stage_main = importlib.import_module(module_name).main
+            exit_code = stage_main()
+        if exit_code:
+            raise RuntimeError(f"{module_name}.main() returned {exit_code}")
         logging.info(f"✅ Completed: {description}")
-        if result.stdout:
-            logging.info(f"Output: {result.stdout}")
+        log_stage_output(output)
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception:
+        log_stage_output(output)
         if optional:
-            logging.warning(f"⚠️ Optional step failed: {description}")
-            logging.warning(f"Error: {e.stderr}")
+            logging.warning(f"⚠️ Optional step failed: {description}", exc_info=True)
             return True  # Continue pipeline for optional steps
         else:
-            logging.error(f"❌ Failed: {description}")
-            logging.error(f"Error: {e.stderr}")
+            logging.exception(f"❌ Failed: {description}")
             return False
 
 def main():
@@ -54,50 +86,48 @@ def main():
     logging.info("▶▶▶ STARTING STOCK DATA UPDATE WORKFLOW")
     logging.info("=" * 60)
     
-    # Define script paths relative to tastock directory
-    tastock_path = os.path.dirname(os.path.dirname(__file__))
-    
-    scripts = [
+    stages = [
         {
-            'path': os.path.join(tastock_path, 'scripts/crawl_cafef_data_and_save_portfolios_to_root_data_folder.py'),
+            'module': 'src.tastock.scripts.crawl_cafef_data_and_save_portfolios_to_root_data_folder',
             'description': 'CafeF Data Crawler - Download stock data from CafeF',
             'optional': False
         },
         {
-            'path': os.path.join(tastock_path, 'scripts/calculate_from_history.py'),
+            'module': 'src.tastock.scripts.calculate_from_history',
             'description': 'Calculate from History - Process historical performance data',
             'optional': True
         },
         {
-            'path': os.path.join(tastock_path, 'scripts/generate_investment_signals.py'),
+            'module': 'src.tastock.scripts.generate_investment_signals',
             'description': 'Generate Investment Signals - Create trading recommendations',
             'optional': False
         },
         {
-            'path': os.path.join(tastock_path, 'scripts/generate_intrinsic_values.py'),
+            'module': 'src.tastock.scripts.generate_intrinsic_values',
             'description': 'Generate Intrinsic Values - Calculate stock valuations',
             'optional': True
         },
         {
-            'path': os.path.join(tastock_path, 'crawlers/bizuni_crawler.py'),
+            'module': 'src.tastock.crawlers.bizuni_crawler',
             'description': 'BizUni Crawler - Fetch additional market data (requires login)',
             'optional': True
+        },
+        {
+            'module': 'src.tastock.scripts.convert_dashboard_data_to_parquet',
+            'description': 'Parquet Converter - Write Parquet copies of the dashboard CSV files',
+            'optional': True
         }
     ]
     
-    # Execute scripts in sequence
+    # Execute stages in sequence within this process
     success_count = 0
-    for i, script in enumerate(scripts, 1):
-        logging.info(f"\n[STEP {i}/{len(scripts)}] {script['description']}")
+    for i, stage in enumerate(stages, 1):
+        logging.info(f"\n[STEP {i}/{len(stages)}] {stage['description']}")
         logging.info("-" * 50)
         
-        if not os.path.exists(script['path']):
-            logging.error(f"Script not found: {script['path']}")
-            continue
-            
-        if run_script(script['path'], script['description'], script.get('optional', False)):
+        if run_stage(stage['module'], stage['description'], stage.get('optional', False)):
             success_count += 1
-        elif not script.get('optional', False):
+        elif not stage.get('optional', False):
             logging.error(f"Pipeline failed at step {i} (required step)")
             break
     
@@ -108,18 +138,17 @@ def main():
     logging.info("\n" + "=" * 60)
     logging.info("💯 WORKFLOW EXECUTION SUMMARY")
     logging.info("=" * 60)
-    logging.info(f"Total scripts: {len(scripts)}")
+    logging.info(f"Total stages: {len(stages)}")
     logging.info(f"Successful: {success_count}")
-    logging.info(f"Failed: {len(scripts) - success_count}")
+    logging.info(f"Failed: {len(stages) - success_count}")
     logging.info(f"Duration: {duration}")
     
-    if success_count == len(scripts):
-        logging.info("✅ All scripts completed successfully!")
+    if success_count == len(stages):
+        logging.info("✅ All stages completed successfully!")
         
         # Auto-commit data files if workflow completed successfully
         try:
             logging.info("\n💾 Auto-committing updated data files...")
-            import subprocess
             
             # Add only root data CSV files
             subprocess.run(["git", "add", "data/*.csv"], check=True, cwd=".")
@@ -139,7 +168,7 @@ def main():
         
         return 0
     else:
-        logging.error("❌ Some scripts failed. Check logs above.")
+        logging.error("❌ Some stages failed. Check logs above.")
         return 1
 
 if __name__ == "__main__":
@@ -1,70 +1,79 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html
 import re
 
+# One pooled session so repeated symbols reuse the TCP/TLS connection to cafef.vn
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                      max_retries=Retry(total=3, backoff_factor=0.3)))
+SESSION.headers.update({'Accept-Encoding': 'gzip, deflate'})
+
+# Patterns are compiled once and matched against the page's text nodes, collected in a single XPath query
+ALL_TEXT = etree.XPath('//text()')
+NUM = re.compile(r'[\d,\.]+')
+FINANCIAL_LINK = re.compile(r'bao-cao-tai-chinh|financial')
+
+# Labels whose value follows them on the page
+VALUE_PATTERNS = {
+    'P/E': re.compile(r'P/E\s*:'),
+    'P/B': re.compile(r'P/B\s*:')
+}
+
+# Financial terms whose occurrences are counted
+COUNT_PATTERNS = {
+    'EPS_found': re.compile(r'EPS.*nghìn đồng'),
+    'Market_Cap_found': re.compile(r'Vốn hóa'),
+    'Revenue_found': re.compile(r'Doanh thu'),
+    'Profit_found': re.compile(r'Lợi nhuận'),
+    'ROE_found': re.compile(r'ROE|Return on Equity')  # ROE (có thể trong báo cáo tài chính)
+}
+
+def next_sibling_text(text_node):
+    """Text right after the element that contains text_node"""
+    parent = text_node.getparent()
+    if text_node.is_tail:
+        parent = parent.getparent()
+    if parent is None:
+        return ''
+    if parent.tail and parent.tail.strip():
+        return parent.tail
+    following = parent.getnext()
+    return following.text_content() if following is not None else ''
+
 def test_cafef_data(symbol="FPT"):
     url = f"https://cafef.vn/du-lieu/hose/{symbol.lower()}-cong-ty-co-phan-{symbol.lower()}.chn"
     
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = SESSION.get(url, timeout=10)
+        tree = html.fromstring(response.content)
         
         # Tìm các thông số tài chính
         data = {}
         
-        # P/E ratio
-        pe_elements = soup.find_all(text=re.compile(r'P/E\s*:'))
-        if pe_elements:
-            for elem in pe_elements:
-                parent = elem.parent
-                if parent and parent.next_sibling:
-                    pe_text = str(parent.next_sibling).strip()
-                    pe_match = re.search(r'[\d,\.]+', pe_text)
-                    if pe_match:
-                        data['P/E'] = pe_match.group()
-        
-        # P/B ratio
-        pb_elements = soup.find_all(text=re.compile(r'P/B\s*:'))
-        if pb_elements:
-            for elem in pb_elements:
-                parent = elem.parent
-                if parent and parent.next_sibling:
-                    pb_text = str(parent.next_sibling).strip()
-                    pb_match = re.search(r'[\d,\.]+', pb_text)
-                    if pb_match:
-                        data['P/B'] = pb_match.group()
-        
-        # EPS
-        eps_elements = soup.find_all(text=re.compile(r'EPS.*nghìn đồng'))
-        if eps_elements:
-            data['EPS_found'] = len(eps_elements)
-        
-        # Vốn hóa
-        market_cap = soup.find_all(text=re.compile(r'Vốn hóa'))
-        if market_cap:
-            data['Market_Cap_found'] = len(market_cap)
-        
-        # Doanh thu
-        revenue = soup.find_all(text=re.compile(r'Doanh thu'))
-        if revenue:
-            data['Revenue_found'] = len(revenue)
+        text_nodes = ALL_TEXT(tree)
         
-        # Lợi nhuận
-        profit = soup.find_all(text=re.compile(r'Lợi nhuận'))
-        if profit:
-            data['Profit_found'] = len(profit)
+        # P/E, P/B ratio
+        for key, pattern in VALUE_PATTERNS.items():
+            for elem in text_nodes:
+                if pattern.search(elem):
+                    value_match = NUM.search(next_sibling_text(elem).strip())
+                    if value_match:
+                        data[key] = value_match.group()
         
-        # ROE (có thể trong báo cáo tài chính)
-        roe = soup.find_all(text=re.compile(r'ROE|Return on Equity'))
-        if roe:
-            data['ROE_found'] = len(roe)
+        # EPS, Vốn hóa, Doanh thu, Lợi nhuận, ROE
+        for key, pattern in COUNT_PATTERNS.items():
+            count = sum(1 for elem in text_nodes if pattern.search(elem))
+            if count:
+                data[key] = count
         
         print(f"=== Kết quả crawl {symbol} từ CafeF ===")
         for key, value in data.items():
             print(f"{key}: {value}")
         
         # Kiểm tra các link báo cáo tài chính
-        financial_links = soup.find_all('a', href=re.compile(r'bao-cao-tai-chinh|financial'))
+        financial_links = [a for a in tree.iter('a') if FINANCIAL_LINK.search(a.get('href', ''))]
         print(f"\nSố link báo cáo tài chính tìm thấy: {len(financial_links)}")
         
         return data
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the ChatGPT dashboard feature kernels
+Checks the single-pass price features against the pandas rolling/pct_change versions
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.chatgpt.chatgpt_dashboard import _price_features
+
+def pandas_price_features(close):
+    """Reference ma5, ma10, return_1d and return_5d computed with pandas."""
+    s = pd.Series(close)
+    return np.column_stack([
+        s.rolling(window=5).mean(),
+        s.rolling(window=10).mean(),
+        s.pct_change(1, fill_method=None),
+        s.pct_change(5, fill_method=None)
+    ])
+
+def test_price_features():
+    """Test that the price features match pandas, including NaN closes."""
+
+    print("🧪 Testing price features...")
+
+    np.random.seed(42)
+    close = 100 * np.cumprod(1 + np.random.normal(0, 0.02, 60))
+    cases = {
+        'clean': close.copy(),
+        'leading NaN': np.concatenate([np.full(7, np.nan), close[7:]]),
+        'gap': close.copy()
+    }
+    cases['gap'][[12, 30, 31]] = np.nan
+
+    success = True
+    for name, values in cases.items():
+        if np.allclose(_price_features(values), pandas_price_features(values), equal_nan=True):
+            print(f"✅ {name}: matches pandas")
+        else:
+            print(f"❌ {name}: differs from pandas")
+            success = False
+
+    return success
+
+def main():
+    """Run all tests."""
+
+    print("🚀 Starting ChatGPT Feature Tests...\n")
+
+    success = test_price_features()
+
+    if success:
+        print("\n🎉 All tests passed!")
+    else:
+        print("\n❌ Some tests failed")
+    return success
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
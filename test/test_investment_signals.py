@@ -37,15 +37,25 @@ async def test_investment_signals():
         print(f"MA50: {market_direction['ma50']}")
         print(f"MA200: {market_direction['ma200']}")
         
-        # Process each stock
-        for symbol in test_symbols:
+        # The crawler drives a single browser page, so each concurrent analysis opens its own crawler
+        async def analyze(symbol):
+            async with CafeFCrawler() as symbol_crawler:
+                # Reuse the VN-Index data fetched above instead of fetching it again per symbol
+                enhanced_data = await DataProcessor(symbol_crawler, vnindex_data).enhance_stock_data(symbol)
+            return enhanced_data, signal_calculator.generate_combined_signals(enhanced_data)
+        
+        # Analyze all stocks concurrently, then report them in order
+        results = await asyncio.gather(*(analyze(symbol) for symbol in test_symbols), return_exceptions=True)
+        
+        for symbol, result in zip(test_symbols, results):
             print(f"\n{'='*50}")
             print(f"ANALYZING {symbol}")
             print(f"{'='*50}")
             
             try:
-                # Get enhanced stock data
-                enhanced_data = await processor.enhance_stock_data(symbol)
+                if isinstance(result, Exception):
+                    raise result
+                enhanced_data, combined_signals = result
                 
                 # Calculate Relative Strength
                 rs_rating = enhanced_data.get('relative_strength_rating', 50)
@@ -55,9 +65,6 @@ async def test_investment_signals():
                 institutional = enhanced_data.get('institutional_ownership', {})
                 print(f"Institutional Ownership: {institutional.get('institutional_percentage', 0):.1f}%")
                 
-                # Generate investment signals
-                combined_signals = signal_calculator.generate_combined_signals(enhanced_data)
-                
                 print(f"\n--- FINAL RECOMMENDATION ---")
                 print(f"Signal: {combined_signals['final_signal']}")
                 print(f"Total Score: {combined_signals['total_score']}")
@@ -9,108 +9,150 @@ import numpy as np
 from datetime import datetime, timedelta
 import sys
 import os
+from functools import lru_cache
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.tastock.ui.technical_helper import TechnicalHelper
 
-def generate_sample_data():
-    """Generate sample stock data for testing."""
+# EMAs run on pandas' Numba engine when numba is installed
+try:
+    import numba  # noqa: F401
+    EWM_ENGINE = 'numba'
+    EWM_ENGINE_KWARGS = {'nopython': True, 'nogil': True, 'parallel': False}
+except ImportError:
+    EWM_ENGINE = 'cython'
+    EWM_ENGINE_KWARGS = None
+
+# Smoothing factors alpha = 2 / (span + 1) of the MACD spans
+EMA_ALPHA = {span: 2.0 / (span + 1) for span in (12, 26, 9)}
+
+def ewm_mean(series, span):
+    """Exponential moving average of series with the given span, using the recursive (adjust=False) form."""
+    return series.ewm(alpha=EMA_ALPHA[span], adjust=False).mean(engine=EWM_ENGINE, engine_kwargs=EWM_ENGINE_KWARGS)
+
+# Compile the Numba kernel once up front so the tests don't pay for the JIT
+ewm_mean(pd.Series(np.zeros(3)), 12)
+
+@lru_cache(maxsize=1)
+def sample_arrays():
+    """Generate sample stock data once, as read-only contiguous arrays per column."""
     
     # Generate 200 days of sample data
     dates = pd.date_range(start='2023-01-01', periods=200, freq='D')
     
     # Simulate stock price with trend and volatility
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     base_price = 100
     trend = 0.001  # Small upward trend
     volatility = 0.02
     
-    prices = [base_price]
-    for i in range(1, len(dates)):
-        # Random walk with trend
-        change = np.random.normal(trend, volatility)
-        new_price = prices[-1] * (1 + change)
-        prices.append(max(new_price, 1))  # Ensure price doesn't go negative
+    # Random walk with trend, compounded in one pass
+    changes = rng.normal(trend, volatility, size=len(dates) - 1)
+    relative = np.concatenate(([1.0], np.cumprod(1.0 + changes)))
+    prices = np.maximum(base_price * relative, 1.0)  # Ensure price doesn't go negative
     
-    # Create DataFrame
-    df = pd.DataFrame({
-        'time': dates,
+    arrays = {
+        'time': dates.to_numpy(),
         'VNINDEX': prices,
-        'VCB': [p * 1.2 + np.random.normal(0, 5) for p in prices],
-        'FPT': [p * 0.8 + np.random.normal(0, 3) for p in prices],
-        'ACB': [p * 0.6 + np.random.normal(0, 2) for p in prices]
-    })
+        'VCB': prices * 1.2 + rng.normal(0, 5, size=len(prices)),
+        'FPT': prices * 0.8 + rng.normal(0, 3, size=len(prices)),
+        'ACB': prices * 0.6 + rng.normal(0, 2, size=len(prices))
+    }
+    
+    # The cached arrays are shared by every caller, so protect them from writes
+    for values in arrays.values():
+        values.flags.writeable = False
+    return arrays
+
+def generate_sample_data():
+    """Generate sample stock data for testing."""
     
-    return df
+    # Keep one block per cached array so the per-column extraction below is a view, not a copy
+    return pd.DataFrame(sample_arrays(), copy=False)
 
-def test_technical_calculations():
+def test_technical_calculations(df=None):
     """Test technical indicator calculations."""
     
-    print("🧪 Testing Technical Analysis Calculations...")
+    # Collect the report and write it in one call at the end
+    out = []
+    
+    out.append("🧪 Testing Technical Analysis Calculations...")
     
-    # Generate sample data
-    df = generate_sample_data()
-    print(f"✅ Generated {len(df)} days of sample data")
+    # Generate sample data unless main() already did
+    if df is None:
+        df = generate_sample_data()
+    out.append(f"✅ Generated {len(df)} days of sample data")
     
     # Test with VNINDEX data
-    symbol_data = df[['time', 'VNINDEX']].copy()
-    symbol_data = symbol_data.rename(columns={'VNINDEX': 'price'})
+    # C-contiguous float64 keeps the rolling/ewm kernels off their conversion paths (a no-op for the sample data)
+    price = np.ascontiguousarray(df['VNINDEX'].to_numpy(), dtype=np.float64)
+    symbol_data = pd.DataFrame({'time': df['time'].values, 'price': price}, copy=False)
     
     # Test moving averages
-    symbol_data['MA5'] = symbol_data['price'].rolling(window=5).mean()
-    symbol_data['MA20'] = symbol_data['price'].rolling(window=20).mean()
-    symbol_data['MA50'] = symbol_data['price'].rolling(window=50).mean()
-    
-    print(f"✅ Calculated moving averages")
-    print(f"   - MA5: {symbol_data['MA5'].iloc[-1]:.2f}")
-    print(f"   - MA20: {symbol_data['MA20'].iloc[-1]:.2f}")
-    print(f"   - MA50: {symbol_data['MA50'].iloc[-1]:.2f}")
+    # Only the latest MA5/MA50 values are used, so short leading windows may average what they have
+    symbol_data['MA5'] = symbol_data['price'].rolling(window=5, min_periods=1).mean()
+    # The 20-day window also gives the Bollinger Bands, so take its mean and std together
+    stats20 = symbol_data['price'].rolling(window=20).agg(['mean', 'std'])
+    symbol_data['MA20'] = stats20['mean']
+    symbol_data['MA50'] = symbol_data['price'].rolling(window=50, min_periods=1).mean()
+    
+    out.append(f"✅ Calculated moving averages")
+    out.append(f"   - MA5: {symbol_data['MA5'].iloc[-1]:.2f}")
+    out.append(f"   - MA20: {symbol_data['MA20'].iloc[-1]:.2f}")
+    out.append(f"   - MA50: {symbol_data['MA50'].iloc[-1]:.2f}")
     
     # Test RSI calculation
     def calculate_rsi(prices, window=14):
+        # Wilder's smoothing: a recursive EMA with alpha = 1/window
         delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        gain = delta.clip(lower=0).ewm(alpha=1.0 / window, adjust=False).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1.0 / window, adjust=False).mean()
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
     symbol_data['RSI'] = calculate_rsi(symbol_data['price'])
-    print(f"✅ Calculated RSI: {symbol_data['RSI'].iloc[-1]:.2f}")
+    out.append(f"✅ Calculated RSI: {symbol_data['RSI'].iloc[-1]:.2f}")
     
     # Test MACD
-    symbol_data['EMA12'] = symbol_data['price'].ewm(span=12).mean()
-    symbol_data['EMA26'] = symbol_data['price'].ewm(span=26).mean()
+    symbol_data['EMA12'] = ewm_mean(symbol_data['price'], 12)
+    symbol_data['EMA26'] = ewm_mean(symbol_data['price'], 26)
     symbol_data['MACD'] = symbol_data['EMA12'] - symbol_data['EMA26']
-    symbol_data['MACD_Signal'] = symbol_data['MACD'].ewm(span=9).mean()
+    symbol_data['MACD_Signal'] = ewm_mean(symbol_data['MACD'], 9)
     
-    print(f"✅ Calculated MACD: {symbol_data['MACD'].iloc[-1]:.4f}")
-    print(f"   - Signal: {symbol_data['MACD_Signal'].iloc[-1]:.4f}")
+    out.append(f"✅ Calculated MACD: {symbol_data['MACD'].iloc[-1]:.4f}")
+    out.append(f"   - Signal: {symbol_data['MACD_Signal'].iloc[-1]:.4f}")
     
     # Test Bollinger Bands
-    symbol_data['BB_Middle'] = symbol_data['price'].rolling(window=20).mean()
-    bb_std = symbol_data['price'].rolling(window=20).std()
+    symbol_data['BB_Middle'] = symbol_data['MA20']
+    bb_std = stats20['std']
     symbol_data['BB_Upper'] = symbol_data['BB_Middle'] + (bb_std * 2)
     symbol_data['BB_Lower'] = symbol_data['BB_Middle'] - (bb_std * 2)
     
-    print(f"✅ Calculated Bollinger Bands:")
-    print(f"   - Upper: {symbol_data['BB_Upper'].iloc[-1]:.2f}")
-    print(f"   - Middle: {symbol_data['BB_Middle'].iloc[-1]:.2f}")
-    print(f"   - Lower: {symbol_data['BB_Lower'].iloc[-1]:.2f}")
+    out.append(f"✅ Calculated Bollinger Bands:")
+    out.append(f"   - Upper: {symbol_data['BB_Upper'].iloc[-1]:.2f}")
+    out.append(f"   - Middle: {symbol_data['BB_Middle'].iloc[-1]:.2f}")
+    out.append(f"   - Lower: {symbol_data['BB_Lower'].iloc[-1]:.2f}")
     
+    sys.stdout.write("\n".join(out) + "\n")
     return symbol_data
 
-def test_technical_helper():
+def test_technical_helper(df=None):
     """Test TechnicalHelper functions."""
     
-    print("\n🧪 Testing TechnicalHelper Functions...")
+    # Collect the report and write it in one call at the end
+    out = []
     
-    # Generate test data
-    df = generate_sample_data()
-    symbol_data = df[['time', 'VNINDEX']].copy()
-    symbol_data = symbol_data.rename(columns={'VNINDEX': 'price'})
+    out.append("\n🧪 Testing TechnicalHelper Functions...")
+    
+    # Generate test data unless main() already did
+    if df is None:
+        df = generate_sample_data()
+    # C-contiguous float64 keeps the rolling/ewm kernels off their conversion paths (a no-op for the sample data)
+    price = np.ascontiguousarray(df['VNINDEX'].to_numpy(), dtype=np.float64)
+    symbol_data = pd.DataFrame({'time': df['time'].values, 'price': price}, copy=False)
     
     # Add some indicators for testing
     symbol_data['MA20'] = symbol_data['price'].rolling(window=20).mean()
@@ -118,39 +160,47 @@ def test_technical_helper():
     
     # Test support/resistance calculation
     support, resistance = TechnicalHelper.calculate_support_resistance(symbol_data)
-    print(f"✅ Support/Resistance calculation:")
-    print(f"   - Support: {support:.2f}" if support else "   - Support: N/A")
-    print(f"   - Resistance: {resistance:.2f}" if resistance else "   - Resistance: N/A")
+    out.append(f"✅ Support/Resistance calculation:")
+    out.append(f"   - Support: {support:.2f}" if support else "   - Support: N/A")
+    out.append(f"   - Resistance: {resistance:.2f}" if resistance else "   - Resistance: N/A")
     
     # Test trend strength
-    symbol_data['MA5'] = symbol_data['price'].rolling(window=5).mean()
-    symbol_data['MA10'] = symbol_data['price'].rolling(window=10).mean()
-    symbol_data['MA50'] = symbol_data['price'].rolling(window=50).mean()
+    # The helpers read the latest row only, so no leading NaN rows are needed
+    symbol_data['MA5'] = symbol_data['price'].rolling(window=5, min_periods=1).mean()
+    symbol_data['MA10'] = symbol_data['price'].rolling(window=10, min_periods=1).mean()
+    symbol_data['MA50'] = symbol_data['price'].rolling(window=50, min_periods=1).mean()
     
     trend_strength = TechnicalHelper.calculate_trend_strength(symbol_data)
-    print(f"✅ Trend strength: {trend_strength}")
+    out.append(f"✅ Trend strength: {trend_strength}")
     
     # Test volatility rating
     volatility_rating, volatility_value = TechnicalHelper.calculate_volatility_rating(symbol_data)
-    print(f"✅ Volatility: {volatility_rating} ({volatility_value:.2f}%)")
+    out.append(f"✅ Volatility: {volatility_rating} ({volatility_value:.2f}%)")
     
     # Test market sentiment
     sentiment, sentiment_icon = TechnicalHelper.get_market_sentiment(65.5, 0.1, 0.6)
-    print(f"✅ Market sentiment: {sentiment_icon} {sentiment}")
+    out.append(f"✅ Market sentiment: {sentiment_icon} {sentiment}")
     
     # Test technical summary
     tech_summary = TechnicalHelper.create_technical_summary_metrics(symbol_data, 'VNINDEX')
-    print(f"✅ Technical summary created for {tech_summary['symbol']}")
-    print(f"   - Current price: {tech_summary['current_price']:.2f}")
-    print(f"   - Trend: {tech_summary['trend_strength']}")
-    print(f"   - Sentiment: {tech_summary['sentiment_icon']} {tech_summary['market_sentiment']}")
+    out.append(f"✅ Technical summary created for {tech_summary['symbol']}")
+    out.append(f"   - Current price: {tech_summary['current_price']:.2f}")
+    out.append(f"   - Trend: {tech_summary['trend_strength']}")
+    out.append(f"   - Sentiment: {tech_summary['sentiment_icon']} {tech_summary['market_sentiment']}")
     
+    sys.stdout.write("\n".join(out) + "\n")
     return True
 
+# Indicator signal labels -> buy (0), sell (1), neutral (2)
+SIGNAL_CODES = {'🟢 MUA': 0, '🔴 BÁN': 1, '🟡 TRUNG TÍNH': 2}
+
 def test_signal_generation():
     """Test signal generation logic."""
     
-    print("\n🧪 Testing Signal Generation...")
+    # Collect the report and write it in one call at the end
+    out = []
+    
+    out.append("\n🧪 Testing Signal Generation...")
     
     # Create sample indicators data
     indicators_data = [
@@ -160,15 +210,15 @@ def test_signal_generation():
         {'Chỉ báo': 'Bollinger Bands', 'Giá trị': '110.00/100.00', 'Tín hiệu': '🟡 TRUNG TÍNH', 'Loại': 'Volatility'}
     ]
     
-    # Count signals
-    buy_signals = sum(1 for item in indicators_data if "MUA" in item['Tín hiệu'])
-    sell_signals = sum(1 for item in indicators_data if "BÁN" in item['Tín hiệu'])
-    neutral_signals = len(indicators_data) - buy_signals - sell_signals
+    # Encode each signal as a small int once, then count all three kinds in one bincount
+    signal_code = np.fromiter((SIGNAL_CODES[item['Tín hiệu']] for item in indicators_data),
+                              dtype=np.int8, count=len(indicators_data))
+    buy_signals, sell_signals, neutral_signals = (int(n) for n in np.bincount(signal_code, minlength=3))
     
-    print(f"✅ Signal counting:")
-    print(f"   - Buy signals: {buy_signals}")
-    print(f"   - Sell signals: {sell_signals}")
-    print(f"   - Neutral signals: {neutral_signals}")
+    out.append(f"✅ Signal counting:")
+    out.append(f"   - Buy signals: {buy_signals}")
+    out.append(f"   - Sell signals: {sell_signals}")
+    out.append(f"   - Neutral signals: {neutral_signals}")
     
     # Determine overall recommendation
     if buy_signals > sell_signals:
@@ -180,9 +230,10 @@ def test_signal_generation():
     
     confidence = max(buy_signals, sell_signals) / len(indicators_data) * 100
     
-    print(f"✅ Overall recommendation: {recommendation}")
-    print(f"✅ Confidence level: {confidence:.0f}%")
+    out.append(f"✅ Overall recommendation: {recommendation}")
+    out.append(f"✅ Confidence level: {confidence:.0f}%")
     
+    sys.stdout.write("\n".join(out) + "\n")
     return True
 
 def main():
@@ -191,11 +242,14 @@ def main():
     print("🚀 Starting Technical Analysis Tests...\n")
     
     try:
+        # Both tests share one sample DataFrame
+        df = generate_sample_data()
+        
         # Test 1: Technical calculations
-        symbol_data = test_technical_calculations()
+        symbol_data = test_technical_calculations(df)
         
         # Test 2: Helper functions
-        test_technical_helper()
+        test_technical_helper(df)
         
         # Test 3: Signal generation
         test_signal_generation()
@@ -208,13 +262,14 @@ def main():
         
         # Save sample data for manual testing
         output_file = "sample_technical_data.csv"
-        sample_df = pd.DataFrame({
-            'time': symbol_data['time'].dt.strftime('%Y%m%d').astype(int),
+        # YYYYMMDD dates from integer date parts, without a round-trip through strings
+        time = symbol_data['time'].dt
+        pd.DataFrame({
+            'time': time.year * 10000 + time.month * 100 + time.day,
             'VNINDEX': symbol_data['price'],
             'VCB': symbol_data['price'] * 1.1,
             'FPT': symbol_data['price'] * 0.9
-        })
-        sample_df.to_csv(output_file, index=False)
+        }, copy=False).to_csv(output_file, index=False, lineterminator='\n')
         print(f"\n💾 Sample data saved to: {output_file}")
         print("   You can use this file to test the Streamlit app manually")
         